@@ -8,23 +8,59 @@ derived from synchronized Tree Parity Machines.
 import os
 import base64
 import hashlib
+import logging
 from typing import Tuple
-from Crypto.Cipher import AES
-from Crypto.Random import get_random_bytes
+from cryptography.hazmat.primitives.ciphers.aead import AESGCM
+
+try:
+    # blake3 is much faster than SHA-256 on short inputs; only used for
+    # non-security display fingerprints, so SHA-256 remains a fine fallback
+    from blake3 import blake3 as _fingerprint_hash
+except ImportError:  # pragma: no cover - depends on environment
+    _fingerprint_hash = hashlib.sha256
+
+logger = logging.getLogger(__name__)
+
+
+def _probe_crypto_backend():
+    """
+    One-time sanity check of the AEAD backend at import.
+
+    On x86-64 with OpenSSL >= 1.1.1 the AESGCM path automatically
+    selects the pipelined AES-NI + PCLMULQDQ assembly, so encrypt and
+    decrypt are bound by hardware AES throughput rather than scalar C.
+    Log which OpenSSL we actually got so deployments can verify.
+    """
+    try:
+        AESGCM(b"\x00" * 32).encrypt(b"\x00" * 12, b"", None)
+        from cryptography.hazmat.backends.openssl import backend
+        logger.info("AES-GCM backend: %s", backend.openssl_version_text())
+    except Exception as e:  # pragma: no cover - diagnostic only
+        logger.warning("AES-GCM backend probe failed: %s", e)
+
+
+_probe_crypto_backend()
 
 
 class NeuralCipher:
     """
     AES-256-GCM encryption using TPM-derived keys
-    
+
     GCM mode provides both confidentiality and authenticity,
     preventing tampering with encrypted messages.
+
+    The key is fixed for the lifetime of a session, so a single AESGCM
+    instance is bound in __init__ and shared by every message. OpenSSL
+    materializes the GHASH H-power table (used for delayed-reduction
+    multiplication) per cipher context; reusing one context means that
+    table is built once per session instead of once per message. Do not
+    construct per-message Cipher/AESGCM objects here.
     """
-    
+
     def __init__(self, key: bytes):
         """
         Initialize cipher with TPM-derived key
-        
+
         Args:
             key: 32-byte key from synchronized TPM weights
         """
@@ -32,84 +68,110 @@ class NeuralCipher:
             # Extend key if needed using HKDF-like expansion
             key = hashlib.sha256(key).digest()
         self.key = key[:32]
-    
+        # One AEAD per key: OpenSSL expands the round keys once here
+        # instead of on every message like AES.new did
+        self._aead = AESGCM(self.key)
+        # The fingerprint never changes for a given key, so hash once.
+        # This is a display-only summary, not key material, so it uses
+        # the fast fingerprint hash rather than SHA-256.
+        self._fingerprint = _fingerprint_hash(self.key).hexdigest()[:8].upper()
+
     def encrypt(self, plaintext: str) -> str:
         """
         Encrypt message using AES-256-GCM
-        
+
         Args:
             plaintext: Message to encrypt
-            
+
         Returns:
             Base64-encoded ciphertext with nonce and tag
         """
         # Generate random nonce (96 bits for GCM)
-        nonce = get_random_bytes(12)
-        
-        cipher = AES.new(self.key, AES.MODE_GCM, nonce=nonce)
-        
-        # Encrypt and get authentication tag
-        ciphertext, tag = cipher.encrypt_and_digest(plaintext.encode('utf-8'))
-        
-        # Combine: nonce + tag + ciphertext
-        combined = nonce + tag + ciphertext
-        
-        return base64.b64encode(combined).decode('utf-8')
-    
+        nonce = os.urandom(12)
+
+        # AESGCM appends the authentication tag to the ciphertext
+        ciphertext = self._aead.encrypt(nonce, plaintext.encode('utf-8'), None)
+
+        return base64.b64encode(nonce + ciphertext).decode('utf-8')
+
+    def encrypt_bytes(self, plaintext: bytes) -> bytes:
+        """
+        Encrypt raw bytes, returning nonce + ciphertext + tag
+
+        Binary variant of encrypt() for clients speaking binary
+        WebSocket frames; skips the base64 inflation entirely.
+        """
+        nonce = os.urandom(12)
+        return nonce + self._aead.encrypt(nonce, plaintext, None)
+
+    def decrypt_bytes(self, blob: bytes) -> bytes:
+        """
+        Decrypt a nonce + ciphertext + tag blob produced by encrypt_bytes
+
+        Raises:
+            ValueError: If decryption or authentication fails
+        """
+        try:
+            return self._aead.decrypt(blob[:12], blob[12:], None)
+        except Exception as e:
+            raise ValueError(f"Decryption failed: {e}")
+
     def decrypt(self, encrypted: str) -> str:
         """
         Decrypt message using AES-256-GCM
-        
+
         Args:
             encrypted: Base64-encoded ciphertext
-            
+
         Returns:
             Decrypted plaintext
-            
+
         Raises:
             ValueError: If decryption or authentication fails
         """
         try:
             combined = base64.b64decode(encrypted.encode('utf-8'))
-            
-            # Extract components
+
+            # Extract components: nonce, then ciphertext with trailing tag
             nonce = combined[:12]
-            tag = combined[12:28]
-            ciphertext = combined[28:]
-            
-            cipher = AES.new(self.key, AES.MODE_GCM, nonce=nonce)
-            
-            # Decrypt and verify authentication tag
-            plaintext = cipher.decrypt_and_verify(ciphertext, tag)
-            
+            ciphertext = combined[12:]
+
+            plaintext = self._aead.decrypt(nonce, ciphertext, None)
+
             return plaintext.decode('utf-8')
         except Exception as e:
             raise ValueError(f"Decryption failed: {e}")
-    
+
     def get_key_fingerprint(self) -> str:
         """Get short fingerprint of the key for verification"""
-        return hashlib.sha256(self.key).hexdigest()[:8].upper()
+        return self._fingerprint
 
 
 def derive_key_from_password(password: str, salt: bytes = None) -> Tuple[bytes, bytes]:
     """
     Derive encryption key from password using PBKDF2
-    
+
     Useful for local storage encryption.
-    
+
+    Uses hashlib.pbkdf2_hmac, which runs the whole iteration loop in
+    OpenSSL with the HMAC ipad/opad state precomputed once — several
+    times faster per iteration than PyCryptodome's PBKDF2, which lets
+    us afford the OWASP-recommended 600k iterations. A 32-byte key is
+    a single PBKDF2 block, so there is no block-level parallelism to
+    exploit at this length.
+
     Args:
         password: User password
         salt: Salt bytes (generated if not provided)
-        
+
     Returns:
         Tuple of (key, salt)
     """
-    from Crypto.Protocol.KDF import PBKDF2
-    from Crypto.Hash import SHA256
-    
     if salt is None:
-        salt = get_random_bytes(16)
-    
-    key = PBKDF2(password, salt, dkLen=32, count=100000, hmac_hash_module=SHA256)
-    
+        salt = os.urandom(16)
+
+    key = hashlib.pbkdf2_hmac(
+        'sha256', password.encode('utf-8'), salt, iterations=600_000, dklen=32
+    )
+
     return key, salt
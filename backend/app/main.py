@@ -5,13 +5,15 @@ FastAPI backend for Neural Network Encrypted Communication
 """
 
 import uuid
-import asyncio
+import json
 import os
 from datetime import datetime
 from fastapi import FastAPI, WebSocket, WebSocketDisconnect, Query, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
 
-from .websocket.handler import manager, SyncSession
+from .websocket.handler import (
+    manager, SyncSession, FRAME_MESSAGE, FRAME_PING, FRAME_REQUEST_SYNC
+)
 from .models.schemas import SessionCreate, SessionResponse, SessionStatus
 
 app = FastAPI(
@@ -139,38 +141,49 @@ async def websocket_endpoint(
             print(f"Starting sync for session {session_id}")
             manager.start_sync_background(session)
         
-        # Message handling loop with timeout to allow checking state
+        # Message handling loop; connection liveness is handled by the
+        # WebSocket protocol ping (ws_ping_interval in the dev block
+        # below, --ws-ping-interval in the Procfile when deployed), so
+        # there is no per-receive timeout Task to create and cancel
         while True:
-            try:
-                # Use wait_for with timeout so we can check connection state
-                data = await asyncio.wait_for(
-                    websocket.receive_json(),
-                    timeout=30.0
-                )
-                
-                if data.get("type") == "message":
-                    # Relay encrypted message to others
-                    await manager.relay_message(
-                        session, 
-                        user_id, 
-                        data.get("ciphertext", "")
+            packet = await websocket.receive()
+
+            if packet["type"] == "websocket.disconnect":
+                raise WebSocketDisconnect(packet.get("code", 1000))
+
+            raw = packet.get("bytes")
+            if raw is not None:
+                # Binary protocol: 1-byte type prefix, no JSON/base64
+                frame_type = raw[:1]
+                if frame_type == FRAME_MESSAGE:
+                    await manager.relay_message_bytes(
+                        session, user_id, raw[1:]
                     )
-                
-                elif data.get("type") == "request_sync":
-                    # Manual sync request
+                elif frame_type == FRAME_REQUEST_SYNC:
                     if session.is_ready() and not session.is_synced and not session.is_syncing:
                         manager.start_sync_background(session)
-                
-                elif data.get("type") == "ping":
-                    await websocket.send_json({"type": "pong"})
-                    
-            except asyncio.TimeoutError:
-                # Send ping to keep connection alive
-                try:
-                    await websocket.send_json({"type": "ping"})
-                except:
-                    break
-    
+                elif frame_type == FRAME_PING:
+                    await websocket.send_bytes(FRAME_PING)
+                continue
+
+            data = json.loads(packet.get("text") or "{}")
+
+            if data.get("type") == "message":
+                # Relay encrypted message to others
+                await manager.relay_message(
+                    session,
+                    user_id,
+                    data.get("ciphertext", "")
+                )
+
+            elif data.get("type") == "request_sync":
+                # Manual sync request
+                if session.is_ready() and not session.is_synced and not session.is_syncing:
+                    manager.start_sync_background(session)
+
+            elif data.get("type") == "ping":
+                await websocket.send_json({"type": "pong"})
+
     except WebSocketDisconnect:
         print(f"User {user_id} disconnected from session {session_id}")
     except ValueError as e:
@@ -186,4 +199,17 @@ async def websocket_endpoint(
 
 if __name__ == "__main__":
     import uvicorn
-    uvicorn.run(app, host="0.0.0.0", port=8000)
+    # Protocol-level ping/pong replaces the old per-receive timeout.
+    # permessage-deflate shrinks the highly repetitive sync_progress
+    # JSON frames ~5-10x on the wire; it is negotiated per connection,
+    # so clients that don't support it are unaffected. Keep these
+    # kwargs in step with the deployed entrypoint's flags in
+    # backend/Procfile — this block only covers local runs.
+    uvicorn.run(
+        app,
+        host="0.0.0.0",
+        port=8000,
+        ws_ping_interval=20,
+        ws_ping_timeout=20,
+        ws_per_message_deflate=True,
+    )
@@ -5,11 +5,114 @@ Manages the TPM synchronization process between two parties.
 Handles input generation, output exchange, and convergence detection.
 """
 
+import functools
+
 import numpy as np
 from typing import Optional, Tuple
 from dataclasses import dataclass, field
+from numba import njit
 from .tpm import TreeParityMachine, LearningRule
 
+# Learning rules encoded as ints so the JIT kernel avoids string
+# compares; resolved once per protocol instead of per round
+RULE_HEBBIAN = 0
+RULE_ANTI_HEBBIAN = 1
+RULE_RANDOM_WALK = 2
+
+_RULE_IDS = {
+    "hebbian": RULE_HEBBIAN,
+    "anti_hebbian": RULE_ANTI_HEBBIAN,
+    "random_walk": RULE_RANDOM_WALK,
+}
+
+
+@functools.lru_cache(maxsize=None)
+def _make_sync_round(K: int, N: int, L: int):
+    """
+    Build a sync-round kernel specialized to one (K, N, L) shape.
+
+    TPM dimensions are fixed for the lifetime of a protocol, so they
+    are baked into the JIT closure as compile-time constants: Numba
+    fully unrolls the small literal-range loops and folds the clip
+    bounds, leaving straight-line code for the default 3x4 machine.
+    Compiled kernels are cached per shape and shared across sessions.
+    """
+
+    @njit(cache=True)
+    def sync_round(
+        weights_a: np.ndarray,
+        weights_b: np.ndarray,
+        X: np.ndarray,
+        rule_id: int,
+        diff_count: int,
+    ) -> Tuple[int, int, bool, int]:
+        """
+        Fused kernel for one synchronization round.
+
+        Computes both TPM outputs, applies both weight updates in place
+        and maintains a running count of differing weight entries,
+        instead of four separate traversals of the same tiny K×N arrays
+        plus a full equality scan. diff_count is the number of positions
+        where the two matrices currently differ; only rows written this
+        round are recounted, so rounds without agreement cost nothing
+        extra.
+
+        Returns:
+            (tau_a, tau_b, agreed, diff_count)
+        """
+        sigma_a = np.empty(K, np.int32)
+        sigma_b = np.empty(K, np.int32)
+        tau_a = 1
+        tau_b = 1
+        for k in range(K):
+            # int32 accumulators: int8 products can overflow at N=64, L=10
+            s_a = np.int32(0)
+            s_b = np.int32(0)
+            for j in range(N):
+                s_a += np.int32(X[k, j]) * np.int32(weights_a[k, j])
+                s_b += np.int32(X[k, j]) * np.int32(weights_b[k, j])
+            sigma_a[k] = 1 if s_a >= 0 else -1
+            sigma_b[k] = 1 if s_b >= 0 else -1
+            tau_a *= sigma_a[k]
+            tau_b *= sigma_b[k]
+
+        agreed = tau_a == tau_b
+
+        if agreed:
+            # Only neurons agreeing with the output update their weights
+            for k in range(K):
+                update_a = sigma_a[k] == tau_a
+                update_b = sigma_b[k] == tau_b
+                if update_a or update_b:
+                    # Retire this row's contribution to the diff count,
+                    # rewrite it, then count the surviving differences
+                    for j in range(N):
+                        if weights_a[k, j] != weights_b[k, j]:
+                            diff_count -= 1
+                    for j in range(N):
+                        if update_a:
+                            if rule_id == 0:        # hebbian
+                                w = weights_a[k, j] + X[k, j] * sigma_a[k]
+                            elif rule_id == 1:      # anti_hebbian
+                                w = weights_a[k, j] - X[k, j] * sigma_a[k]
+                            else:                   # random_walk
+                                w = weights_a[k, j] + X[k, j]
+                            weights_a[k, j] = min(L, max(-L, w))
+                        if update_b:
+                            if rule_id == 0:
+                                w = weights_b[k, j] + X[k, j] * sigma_b[k]
+                            elif rule_id == 1:
+                                w = weights_b[k, j] - X[k, j] * sigma_b[k]
+                            else:
+                                w = weights_b[k, j] + X[k, j]
+                            weights_b[k, j] = min(L, max(-L, w))
+                        if weights_a[k, j] != weights_b[k, j]:
+                            diff_count += 1
+
+        return tau_a, tau_b, agreed, diff_count
+
+    return sync_round
+
 
 @dataclass
 class SyncState:
@@ -61,29 +164,85 @@ class NeuralSyncProtocol:
         self.N = N
         self.L = L
         self.learning_rule = learning_rule
+        self._rule_id = _RULE_IDS[learning_rule]
         self.max_rounds = max_rounds
+
+        # Kernel specialized to this session's shape (cached per K,N,L)
+        self._sync_round = _make_sync_round(K, N, L)
         
         # Initialize both TPMs
         self.tpm_a = TreeParityMachine(K, N, L)
         self.tpm_b = TreeParityMachine(K, N, L)
+
+        # Number of weight positions where the TPMs currently differ;
+        # maintained incrementally by the sync kernel
+        self._diff_count = int(
+            np.count_nonzero(self.tpm_a.weights != self.tpm_b.weights)
+        )
         
         self.state = SyncState()
         self._rng = np.random.default_rng()
-    
+
+        # Progress is a UI estimate; recomputing the K×N similarity
+        # every round is wasted work, so refresh it periodically and
+        # serve the cached value in between
+        self._progress_every = 16
+        self._last_progress = 0.0
+
+        # Inputs are drawn in batches: one Generator call for B rounds
+        # instead of a fresh rng + small allocation per round
+        self._batch_size = 512
+        self._batch_idx = 0
+        self._batch: Optional[np.ndarray] = None
+
+        # Inputs come from the single long-lived generator above; rounds
+        # are labelled with this monotonic counter rather than spending
+        # RNG draws (and Generator constructions) on per-round seeds
+        self._input_counter = 0
+
+        # Single reusable input buffer: rounds overwrite it in place,
+        # so steady state allocates nothing per round
+        self._X_buf = np.empty((K, N), np.int8)
+
+    def _refill_batch(self):
+        """Draw the next batch of round inputs (and seed labels) at once"""
+        B = self._batch_size
+        raw = self._rng.integers(0, 2, size=(B, self.K, self.N), dtype=np.int8)
+        self._batch = raw * 2 - 1  # stays int8, feeds the kernel directly
+        self._batch_idx = 0
+
+    def _next_input(self) -> Tuple[int, np.ndarray]:
+        """
+        Get the next (counter, X) pair from the pre-generated batch
+
+        The counter identifies the round's input for logging; replaying
+        requires the protocol's master RNG state, not a per-round seed.
+        Returns a view of the shared input buffer, valid until the next
+        call; each round must consume its input before the next begins.
+        """
+        if self._batch is None or self._batch_idx >= self._batch_size:
+            self._refill_batch()
+        counter = self._input_counter
+        self._input_counter += 1
+        np.copyto(self._X_buf, self._batch[self._batch_idx])
+        self._batch_idx += 1
+        return counter, self._X_buf
+
     def generate_input(self, seed: Optional[int] = None) -> np.ndarray:
         """
         Generate random input for synchronization round
-        
-        Input values are in {-1, +1}
+
+        Input values are in {-1, +1}. The seeded path builds a fresh
+        Generator for reproducibility; unseeded calls pull from the
+        pre-generated batch.
         """
         if seed is not None:
             rng = np.random.default_rng(seed)
-        else:
-            rng = self._rng
-            
-        # Generate random bits and map to {-1, +1}
-        X = rng.integers(0, 2, size=(self.K, self.N)) * 2 - 1
-        return X
+            # Generate random bits and map to {-1, +1}
+            X = rng.integers(0, 2, size=(self.K, self.N)) * 2 - 1
+            return X
+
+        return self._next_input()[1]
     
     def run_round(self, X: Optional[np.ndarray] = None) -> SyncRoundResult:
         """
@@ -99,33 +258,36 @@ class NeuralSyncProtocol:
             raise RuntimeError("Already synchronized")
         
         # Generate input if not provided
-        seed = int(self._rng.integers(0, 2**31))
         if X is None:
-            X = self.generate_input(seed)
-        
-        # Both TPMs compute output
-        tau_a, sigma_a = self.tpm_a.compute_output(X)
-        tau_b, sigma_b = self.tpm_b.compute_output(X)
+            seed, X = self._next_input()
+        else:
+            seed = self._input_counter
+            self._input_counter += 1
         
-        agreed = tau_a == tau_b
+        # One fused kernel call: both outputs, both updates, diff upkeep
+        X = np.ascontiguousarray(X, dtype=np.int8)
+        tau_a, tau_b, agreed, self._diff_count = self._sync_round(
+            self.tpm_a.weights,
+            self.tpm_b.weights,
+            X,
+            self._rule_id,
+            self._diff_count,
+        )
+        weights_match = self._diff_count == 0
+
         if agreed:
             self.state.agreements += 1
         
-        # Update weights (only happens if outputs match)
-        self.tpm_a.update_weights(X, tau_a, tau_b, sigma_a, self.learning_rule)
-        self.tpm_b.update_weights(X, tau_b, tau_a, sigma_b, self.learning_rule)
-        
-        # Check if weights have synchronized
-        weights_match = np.array_equal(self.tpm_a.weights, self.tpm_b.weights)
-        
         if weights_match:
             self.state.is_synced = True
             self.state.key_hash = self.tpm_a.get_key_hex()[:16]
         
         self.state.round += 1
-        
-        # Calculate sync progress
-        sync_progress = self._calculate_progress()
+
+        # Calculate sync progress (cached between refresh rounds)
+        if weights_match or self.state.round % self._progress_every == 0:
+            self._last_progress = self._calculate_progress()
+        sync_progress = self._last_progress
         
         return SyncRoundResult(
             round=self.state.round,
@@ -182,3 +344,6 @@ class NeuralSyncProtocol:
         self.tpm_a.reset()
         self.tpm_b.reset()
         self.state = SyncState()
+        self._diff_count = int(
+            np.count_nonzero(self.tpm_a.weights != self.tpm_b.weights)
+        )
@@ -10,10 +10,65 @@ creating a shared secret key that an eavesdropper cannot learn.
 import numpy as np
 import hashlib
 from typing import Tuple, Literal
+from numba import njit, prange
 
 LearningRule = Literal["hebbian", "anti_hebbian", "random_walk"]
 
 
+@njit(cache=True, fastmath=True, boundscheck=False)
+def _compute_output_nb(weights: np.ndarray, X: np.ndarray, K: int) -> Tuple[int, np.ndarray]:
+    """
+    JIT-compiled core of compute_output.
+
+    The K×N arrays here are tiny (typically 3×4), so NumPy's per-call
+    dispatch overhead dominates the actual arithmetic. A manual loop
+    compiled by Numba runs the whole multiply-sum-sign pipeline in
+    straight-line machine code.
+    """
+    N = weights.shape[1]
+    sigma = np.empty(K, np.int32)
+    tau = 1
+    for k in range(K):
+        # int32 accumulator: int8 products can overflow at N=64, L=10
+        s = np.int32(0)
+        for j in range(N):
+            s += np.int32(X[k, j]) * np.int32(weights[k, j])
+        # Sign convention: local field of 0 maps to +1
+        sigma[k] = 1 if s >= 0 else -1
+        tau *= sigma[k]
+    return tau, sigma
+
+
+@njit(parallel=True, cache=True, fastmath=True, boundscheck=False)
+def _compute_output_par(weights: np.ndarray, X: np.ndarray, K: int) -> Tuple[int, np.ndarray]:
+    """
+    Parallel variant of _compute_output_nb for large K×N.
+
+    Hidden neurons are independent, so rows are distributed across
+    cores with prange. Only worth it above _PARALLEL_THRESHOLD
+    elements — below that the thread-launch overhead dominates.
+    """
+    N = weights.shape[1]
+    sigma = np.empty(K, np.int32)
+    for k in prange(K):
+        s = np.int32(0)
+        for j in range(N):
+            s += np.int32(X[k, j]) * np.int32(weights[k, j])
+        sigma[k] = 1 if s >= 0 else -1
+    tau = 1
+    for k in range(K):
+        tau *= sigma[k]
+    return tau, sigma
+
+
+# Sessions smaller than this many weights use the serial kernel
+_PARALLEL_THRESHOLD = 256
+
+# Warm up the JIT once at import so the compile cost isn't paid mid-sync
+_compute_output_nb(np.zeros((1, 1), np.int8), np.zeros((1, 1), np.int8), 1)
+_compute_output_par(np.zeros((1, 1), np.int8), np.zeros((1, 1), np.int8), 1)
+
+
 class TreeParityMachine:
     """
     Tree Parity Machine for Neural Key Exchange
@@ -30,8 +85,23 @@ class TreeParityMachine:
         self.N = N
         self.L = L
         # Initialize weights randomly in range [-L, L]
-        self.weights = np.random.randint(-L, L + 1, size=(K, N))
+        # int8 is plenty for |w| <= L <= 10 and cuts hot-loop memory
+        # traffic 8x versus the default int64
+        self.weights = np.random.randint(-L, L + 1, size=(K, N), dtype=np.int8)
     
+    def randomize_weights(self):
+        """
+        Re-draw weights uniformly in [-L, L] into a fresh array
+
+        Reassigns instead of writing through self.weights: a pooled
+        machine's weights may still view a released session's weight
+        bank, and that slot can belong to a live participant again by
+        the time the machine is reused.
+        """
+        self.weights = np.random.randint(
+            -self.L, self.L + 1, size=(self.K, self.N), dtype=np.int8
+        )
+
     def compute_output(self, X: np.ndarray) -> Tuple[int, np.ndarray]:
         """
         Compute TPM output for given input
@@ -43,18 +113,12 @@ class TreeParityMachine:
             tau: Final output (-1 or +1), product of hidden outputs
             sigma: Hidden neuron outputs array of shape (K,)
         """
-        # Compute local field (weighted sum) for each hidden neuron
-        local_fields = np.sum(X * self.weights, axis=1)
-        
-        # Hidden neuron outputs: sign of local field
-        sigma = np.sign(local_fields).astype(np.int32)
-        # Replace zeros with 1 (convention when local field is 0)
-        sigma[sigma == 0] = 1
-        
-        # Final output: product of all hidden outputs
-        tau = int(np.prod(sigma))
-        
-        return tau, sigma
+        X = np.ascontiguousarray(X, dtype=np.int8)
+        if self.K * self.N >= _PARALLEL_THRESHOLD:
+            tau, sigma = _compute_output_par(self.weights, X, self.K)
+        else:
+            tau, sigma = _compute_output_nb(self.weights, X, self.K)
+        return int(tau), sigma
     
     def update_weights(
         self, 
@@ -72,23 +136,24 @@ class TreeParityMachine:
         """
         if tau_self != tau_other:
             return False
-        
-        tau = tau_self  # They're equal
-        
-        for k in range(self.K):
-            # Only update neurons that agree with the output
-            if sigma[k] == tau:
-                if rule == "hebbian":
-                    # Hebbian: w += x * sigma
-                    self.weights[k] = self.weights[k] + X[k] * sigma[k]
-                elif rule == "anti_hebbian":
-                    self.weights[k] = self.weights[k] - X[k] * sigma[k]
-                elif rule == "random_walk":
-                    self.weights[k] = self.weights[k] + X[k]
-                
-                # Clip weights to valid range [-L, L]
-                self.weights[k] = np.clip(self.weights[k], -self.L, self.L)
-        
+
+        # Only neurons that agree with the output update; apply the rule
+        # to all K rows at once with a broadcasted mask instead of a
+        # Python loop with per-row slicing and clipping
+        mask = (sigma == tau_self)[:, None]
+
+        if rule == "hebbian":
+            # Hebbian: w += x * sigma
+            delta = X * sigma[:, None] * mask
+        elif rule == "anti_hebbian":
+            delta = -X * sigma[:, None] * mask
+        else:  # random_walk
+            delta = X * mask
+
+        np.add(self.weights, delta, out=self.weights, casting="unsafe")
+        # Clip weights to valid range [-L, L]
+        np.clip(self.weights, -self.L, self.L, out=self.weights)
+
         return True
     
     def get_key(self, length: int = 32) -> bytes:
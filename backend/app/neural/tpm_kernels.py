@@ -0,0 +1,143 @@
+"""
+Numba kernels for the live sync loop
+
+The WebSocket sync loop runs thousands of rounds over tiny (K×N,
+typically 3×4) int8 arrays, where NumPy's per-call dispatch costs far
+more than the arithmetic. These kernels fuse a whole round — both
+parties' outputs, the weight updates, the attacker's eavesdropping
+attempt and the diff bookkeeping — into one JIT-compiled call.
+
+All kernels compile with nogil=True: they touch only int8/int32 NumPy
+buffers, so the sync loop can push them onto a worker thread
+(asyncio.to_thread) and batches from concurrent sessions genuinely run
+on separate cores instead of serializing on the GIL.
+"""
+
+import functools
+
+import numpy as np
+from numba import njit
+
+from .sync import RULE_HEBBIAN, RULE_ANTI_HEBBIAN, RULE_RANDOM_WALK
+
+# String rule names (as used by the adaptive loop) to kernel rule ids
+RULE_IDS = {
+    "hebbian": RULE_HEBBIAN,
+    "anti_hebbian": RULE_ANTI_HEBBIAN,
+    "random_walk": RULE_RANDOM_WALK,
+}
+
+
+@njit(cache=True, fastmath=True, nogil=True)
+def _apply_update(weights, X, sigma, tau, L, rule_id):
+    """Apply one party's learning-rule update in place"""
+    K, N = weights.shape
+    for k in range(K):
+        if sigma[k] == tau:
+            for j in range(N):
+                if rule_id == 0:        # hebbian
+                    w = weights[k, j] + X[k, j] * sigma[k]
+                elif rule_id == 1:      # anti_hebbian
+                    w = weights[k, j] - X[k, j] * sigma[k]
+                else:                   # random_walk
+                    w = weights[k, j] + X[k, j]
+                weights[k, j] = min(L, max(-L, w))
+
+
+@njit(cache=True, fastmath=True, nogil=True)
+def _outputs(weights, X, sigma):
+    """Fill sigma with hidden outputs and return tau"""
+    K, N = weights.shape
+    tau = 1
+    for k in range(K):
+        # int32 accumulator: int8 products can overflow at N=64, L=10
+        s = np.int32(0)
+        for j in range(N):
+            s += np.int32(X[k, j]) * np.int32(weights[k, j])
+        sigma[k] = 1 if s >= 0 else -1
+        tau *= sigma[k]
+    return tau
+
+
+@functools.lru_cache(maxsize=None)
+def make_sync_rounds_batch(K: int, N: int, L: int):
+    """
+    Build a batch kernel specialized to one (K, N, L) shape.
+
+    Like sync._make_sync_round, the TPM dimensions are baked into the
+    JIT closure as compile-time constants: Numba fully unrolls the
+    literal-range loops, folds the +/-L clip bounds into two constant
+    compares and keeps the default 3x4 machine's state in registers.
+    Compiled kernels are cached per shape and shared across sessions.
+    """
+    lanes = K * N
+    swar = lanes <= 62  # bit-per-lane input packing fits one randint
+
+    @njit(cache=True, fastmath=True, nogil=True)
+    def sync_rounds_batch(wa, wb, we, X, rule_id, n_rounds, use_attacker):
+        """
+        Run up to n_rounds synchronization rounds in one compiled call.
+
+        The asyncio loop previously woke up, generated input, broadcast
+        and slept once per round; batching amortizes all of that Python/
+        event-loop overhead over n_rounds. Inputs are generated in place
+        in X (which afterwards holds the final round's input, as the
+        convergence boost logic needs it), and the loop early-exits the
+        moment the parties' weights match.
+
+        Returns:
+            (rounds_run, tau_a, tau_b, tau_e, sigma_a, sigma_b,
+             weight_diff, attacker_diff)
+        """
+        sigma_a = np.empty(K, np.int32)
+        sigma_b = np.empty(K, np.int32)
+        sigma_e = np.empty(K, np.int32)
+        tau_a = 0
+        tau_b = 0
+        tau_e = 0
+        weight_diff = np.int32(0)
+        attacker_diff = np.int32(0)
+        rounds = 0
+
+        for _ in range(n_rounds):
+            rounds += 1
+
+            if swar:
+                # One RNG draw per round: pack a ±1 lane per bit and
+                # unpack branchlessly, instead of one draw per element
+                bits = np.random.randint(0, 1 << lanes)
+                lane = 0
+                for k in range(K):
+                    for j in range(N):
+                        X[k, j] = np.int8(((bits >> lane) & 1) * 2 - 1)
+                        lane += 1
+            else:
+                for k in range(K):
+                    for j in range(N):
+                        X[k, j] = np.int8(np.random.randint(0, 2) * 2 - 1)
+
+            tau_a = _outputs(wa, X, sigma_a)
+            tau_b = _outputs(wb, X, sigma_b)
+            if use_attacker:
+                tau_e = _outputs(we, X, sigma_e)
+
+            if tau_a == tau_b:
+                _apply_update(wa, X, sigma_a, tau_a, L, rule_id)
+                _apply_update(wb, X, sigma_b, tau_b, L, rule_id)
+                if use_attacker and tau_e == tau_a:
+                    _apply_update(we, X, sigma_e, tau_e, L, rule_id)
+
+            weight_diff = np.int32(0)
+            attacker_diff = np.int32(0)
+            for k in range(K):
+                for j in range(N):
+                    weight_diff += abs(np.int32(wa[k, j]) - np.int32(wb[k, j]))
+                    if use_attacker:
+                        attacker_diff += abs(np.int32(we[k, j]) - np.int32(wa[k, j]))
+
+            if weight_diff == 0:
+                break
+
+        return rounds, tau_a, tau_b, tau_e, sigma_a, sigma_b, weight_diff, attacker_diff
+
+    return sync_rounds_batch
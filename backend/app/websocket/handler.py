@@ -6,16 +6,61 @@ Handles user connections, TPM synchronization, and encrypted messaging.
 """
 
 import asyncio
+import logging
+import time
+
 import numpy as np
+import orjson
+from collections import defaultdict
 from datetime import datetime
-from typing import Dict, Optional, Set
+from typing import Dict, List, Optional, Set, Tuple
 from dataclasses import dataclass, field
 from fastapi import WebSocket
-import traceback
 
 from ..neural.tpm import TreeParityMachine
+from ..neural.tpm_kernels import RULE_IDS, make_sync_rounds_batch
 from ..crypto.encryption import NeuralCipher
 
+logger = logging.getLogger(__name__)
+
+
+async def _drain_outbox(websocket: WebSocket, outbox: "asyncio.Queue"):
+    """Writer task: pump one participant's queued frames onto its socket"""
+    try:
+        while True:
+            payload = await outbox.get()
+            if isinstance(payload, bytes):
+                await websocket.send_bytes(payload)
+            else:
+                await websocket.send_text(payload)
+    except asyncio.CancelledError:
+        raise
+    except Exception as e:
+        # Socket went away; the receive loop handles the disconnect
+        logger.debug("Writer stopped: %s", e)
+
+# Binary WebSocket frame type prefixes (first byte of a binary frame).
+# Binary clients skip JSON and base64 entirely; relayed message frames
+# are 0x01 | sender-id length | sender-id utf-8 | raw AEAD blob.
+FRAME_MESSAGE = b"\x01"
+FRAME_PING = b"\x02"
+FRAME_REQUEST_SYNC = b"\x03"
+
+# Static template for relayed JSON chat frames; the relay path fills in
+# the per-message fields and serializes once with orjson, skipping both
+# Pydantic model construction and stdlib json.dumps
+_MSG_TEMPLATE = {
+    "type": "message",
+    "sender_id": None,
+    "ciphertext": None,
+    "timestamp": None,
+}
+
+
+def _is_progress_frame(payload) -> bool:
+    """True for JSON sync_progress frames, which newer frames supersede"""
+    return isinstance(payload, str) and payload.startswith('{"type":"sync_progress"')
+
 
 @dataclass 
 class SyncSession:
@@ -34,6 +79,19 @@ class SyncSession:
     # Participants and their connections
     participants: Dict[str, WebSocket] = field(default_factory=dict)
     tpms: Dict[str, TreeParityMachine] = field(default_factory=dict)
+
+    # Per-participant outbound queues, each drained by a dedicated
+    # writer task, so a slow client backs up only its own queue and
+    # never stalls the sync loop or the other participant
+    outboxes: Dict[str, asyncio.Queue] = field(default_factory=dict)
+    _writer_tasks: Dict[str, asyncio.Task] = field(default_factory=dict)
+
+    # All three parties' weights live in one contiguous int8 array
+    # (0=first participant, 1=second, 2=attacker); each TPM's .weights
+    # is a view into its slot. For the default 3x4 machine the whole
+    # bank is 36 bytes — a single cache line for every kernel pass.
+    weight_bank: Optional[np.ndarray] = None
+    _bank_slots: Dict[str, int] = field(default_factory=dict)
     
     # Sync state
     sync_round: int = 0
@@ -46,16 +104,115 @@ class SyncSession:
     attacker_tpm: Optional[TreeParityMachine] = None
     attacker_progress: float = 0.0
     show_attacker: bool = True
+
+    # Optional sync pacing in rounds/second, for demos that want to
+    # watch convergence unfold; None runs the sync compute-bound
+    throttle_hz: Optional[float] = None
     
-    def add_participant(self, user_id: str, websocket: WebSocket):
+    def add_participant(
+        self,
+        user_id: str,
+        websocket: WebSocket,
+        tpm: Optional[TreeParityMachine] = None,
+    ):
         """Add a participant to the session"""
         self.participants[user_id] = websocket
-        self.tpms[user_id] = TreeParityMachine(self.tpm_k, self.tpm_n, self.tpm_l)
-    
-    def remove_participant(self, user_id: str):
-        """Remove a participant from the session"""
+
+        # A re-join replaces the socket: stop the old writer task first,
+        # or it leaks blocked on the orphaned queue holding the dead
+        # connection
+        old_task = self._writer_tasks.pop(user_id, None)
+        if old_task is not None:
+            old_task.cancel()
+
+        outbox: asyncio.Queue = asyncio.Queue(maxsize=256)
+        self.outboxes[user_id] = outbox
+        self._writer_tasks[user_id] = asyncio.create_task(
+            _drain_outbox(websocket, outbox)
+        )
+        if self.weight_bank is None:
+            self.weight_bank = np.zeros(
+                (3, self.tpm_k, self.tpm_n), dtype=np.int8
+            )
+
+        # Rebind the TPM's weights to its slot in the shared bank. A
+        # reconnecting user keeps their slot — connect() allows re-joins
+        # under an existing user_id, and assigning the other slot here
+        # would clobber the peer's live weights
+        slot = self._bank_slots.get(user_id)
+        if slot is None:
+            used = set(self._bank_slots.values())
+            slot = 0 if 0 not in used else 1
+            self._bank_slots[user_id] = slot
+
+        if tpm is None:
+            tpm = TreeParityMachine(self.tpm_k, self.tpm_n, self.tpm_l)
+        self.weight_bank[slot, :, :] = tpm.weights
+        tpm.weights = self.weight_bank[slot]
+        self.tpms[user_id] = tpm
+
+    def remove_participant(self, user_id: str) -> Optional[TreeParityMachine]:
+        """Remove a participant; returns their TPM so it can be pooled"""
         self.participants.pop(user_id, None)
-        self.tpms.pop(user_id, None)
+        tpm = self.tpms.pop(user_id, None)
+        self._bank_slots.pop(user_id, None)
+        self.outboxes.pop(user_id, None)
+        task = self._writer_tasks.pop(user_id, None)
+        if task is not None:
+            task.cancel()
+        return tpm
+
+    def queue_payload(self, user_id: str, payload):
+        """
+        Enqueue a pre-serialized frame for one participant
+
+        Bounded queue: when a slow client falls 256 frames behind, the
+        oldest sync_progress frame is dropped — a newer one supersedes
+        it. Chat and control frames are never discarded; a client too
+        slow even for those is closed instead of silently losing
+        messages.
+        """
+        outbox = self.outboxes.get(user_id)
+        if outbox is None:
+            return
+        try:
+            outbox.put_nowait(payload)
+            return
+        except asyncio.QueueFull:
+            pass
+
+        # Drain the backlog, drop its oldest superseded progress frame
+        # and re-queue; no await in between, so the writer can't observe
+        # the queue mid-shuffle
+        backlog = []
+        while True:
+            try:
+                backlog.append(outbox.get_nowait())
+            except asyncio.QueueEmpty:
+                break
+        for i, frame in enumerate(backlog):
+            if _is_progress_frame(frame):
+                del backlog[i]
+                break
+        else:
+            if _is_progress_frame(payload):
+                # Nothing queued is droppable and this frame is a
+                # progress update: skip it, the next one carries
+                # fresher state anyway
+                payload = None
+        if payload is not None:
+            backlog.append(payload)
+        if len(backlog) > outbox.maxsize:
+            # 256 must-deliver frames behind: the client is effectively
+            # gone. Close it (the receive loop cleans up) rather than
+            # dropping chat on the floor
+            backlog = backlog[:outbox.maxsize]
+            websocket = self.participants.get(user_id)
+            if websocket is not None:
+                asyncio.create_task(websocket.close(code=1013))
+            logger.warning("Closing slow client %s: outbound queue overflow", user_id)
+        for frame in backlog:
+            outbox.put_nowait(frame)
     
     def is_ready(self) -> bool:
         """Check if session has two participants ready for sync"""
@@ -70,6 +227,28 @@ class ConnectionManager:
     def __init__(self):
         self.sessions: Dict[str, SyncSession] = {}
         self._sync_tasks: Dict[str, asyncio.Task] = {}
+        # Free-list of TPM instances per (K, N, L): joins on a busy
+        # server reuse machines from finished sessions instead of
+        # constructing fresh ones (and their weight arrays) every time
+        self._tpm_pool: Dict[Tuple[int, int, int], List[TreeParityMachine]] = defaultdict(list)
+
+    def _acquire_tpm(self, K: int, N: int, L: int) -> TreeParityMachine:
+        """Take a pooled TPM of this shape, re-randomized, or build one"""
+        pool = self._tpm_pool[(K, N, L)]
+        if pool:
+            tpm = pool.pop()
+            # Rebind to a fresh private array (randomize_weights
+            # reassigns): the pooled weights may still view a released
+            # session's bank slot, which a live participant can have
+            # re-occupied by now — never write through that view
+            tpm.randomize_weights()
+            return tpm
+        return TreeParityMachine(K, N, L)
+
+    def _release_tpm(self, tpm: Optional[TreeParityMachine]):
+        """Return a TPM to the shape pool for reuse"""
+        if tpm is not None:
+            self._tpm_pool[(tpm.K, tpm.N, tpm.L)].append(tpm)
     
     async def connect(
         self,
@@ -106,7 +285,11 @@ class ConnectionManager:
             await websocket.close()
             raise ValueError("Session is full")
         
-        session.add_participant(user_id, websocket)
+        session.add_participant(
+            user_id,
+            websocket,
+            tpm=self._acquire_tpm(session.tpm_k, session.tpm_n, session.tpm_l),
+        )
         
         # Notify others
         await self.broadcast(session, {
@@ -136,7 +319,7 @@ class ConnectionManager:
             return
         
         session = self.sessions[session_id]
-        session.remove_participant(user_id)
+        self._release_tpm(session.remove_participant(user_id))
         
         # Cancel sync task if running
         if session_id in self._sync_tasks:
@@ -148,10 +331,13 @@ class ConnectionManager:
                 "type": "user_left",
             "user_id": user_id
             })
-            
-            # Clean up empty sessions
-            if not session.participants:
-                del self.sessions[session_id]
+
+        # Clean up empty sessions (also after a completed sync, when
+        # no sync task is left to cancel)
+        if not session.participants:
+            self._release_tpm(session.attacker_tpm)
+            session.attacker_tpm = None
+            del self.sessions[session_id]
     
     async def broadcast(
         self,
@@ -161,18 +347,20 @@ class ConnectionManager:
     ):
         """Broadcast message to all session participants"""
         exclude = exclude or set()
-        
-        disconnected = []
-        for user_id, ws in list(session.participants.items()):
+
+        # Serialize once for everyone (send_json would re-encode per
+        # socket); OPT_SERIALIZE_NUMPY lets numpy scalars pass through
+        # without int()/float() wrapping at the call sites
+        payload = orjson.dumps(
+            message, option=orjson.OPT_SERIALIZE_NUMPY
+        ).decode('utf-8')
+
+        # Hand the frame to each participant's writer task; sends
+        # proceed concurrently and a blocked peer only fills its own
+        # bounded queue
+        for user_id in list(session.participants):
             if user_id not in exclude:
-                try:
-                    await ws.send_json(message)
-                except Exception as e:
-                    print(f"Broadcast error to {user_id}: {e}")
-                    disconnected.append(user_id)
-        
-        for user_id in disconnected:
-            session.remove_participant(user_id)
+                session.queue_payload(user_id, payload)
     
     def start_sync_background(self, session: SyncSession):
         """Start sync as a background task"""
@@ -188,7 +376,7 @@ class ConnectionManager:
         """
         try:
             if not session.is_ready():
-                print(f"Session {session.session_id} not ready")
+                logger.debug("Session %s not ready", session.session_id)
                 return
             
             if session.is_synced or session.is_syncing:
@@ -217,235 +405,263 @@ class ConnectionManager:
             tpm_a = session.tpms[users[0]]
             tpm_b = session.tpms[users[1]]
             
-            # Initialize attacker TPM (Eve - the eavesdropper)
+            # Initialize attacker TPM (Eve - the eavesdropper) in the
+            # bank's third slot so all three parties share one buffer
             if session.show_attacker and session.attacker_tpm is None:
-                session.attacker_tpm = TreeParityMachine(session.tpm_k, session.tpm_n, session.tpm_l)
-                # Initialize attacker progress
-                attacker_diff = np.sum(np.abs(session.attacker_tpm.weights - tpm_a.weights))
+                session.attacker_tpm = self._acquire_tpm(session.tpm_k, session.tpm_n, session.tpm_l)
+                session.weight_bank[2, :, :] = session.attacker_tpm.weights
+                session.attacker_tpm.weights = session.weight_bank[2]
+                # Initialize attacker progress: one broadcasted diff of
+                # the whole bank against slot 0 (the first participant)
+                # gives [0, alice_bob, alice_eve] in a single reduction
+                d = np.abs(session.weight_bank - session.weight_bank[0]).sum(axis=(1, 2))
+                attacker_diff = int(d[2])
                 attacker_max_diff = session.tpm_k * session.tpm_n * (2 * session.tpm_l)
                 session.attacker_progress = 1.0 - (attacker_diff / attacker_max_diff) if attacker_max_diff > 0 else 1.0
-                print(f"[ATTACKER] Eve initialized - attempting to synchronize by eavesdropping")
-                print(f"[ATTACKER] Initial progress: {session.attacker_progress:.2%}")
+                logger.debug("[ATTACKER] Eve initialized - attempting to synchronize by eavesdropping")
+                logger.debug("[ATTACKER] Initial progress: %.2f%%", session.attacker_progress * 100)
             
-            print(f"Starting sync: K={session.tpm_k}, N={session.tpm_n}, L={session.tpm_l}")
-            print(f"Total weight space: {(2*session.tpm_l+1)**(session.tpm_k*session.tpm_n)} states")
+            logger.info("Starting sync: K=%d, N=%d, L=%d", session.tpm_k, session.tpm_n, session.tpm_l)
+            logger.debug("Total weight space: %d states", (2 * session.tpm_l + 1) ** (session.tpm_k * session.tpm_n))
             
-            sync_delay = 0.02
             round_num = 0
-            
-            # Adaptive learning: track progress and switch rules when stuck
-            # Start with random_walk (often more efficient) then adapt
+            progress = 0.0
+
+            # Hoist per-iteration invariants out of the loop: dataclass
+            # attribute lookups and the diff normalization are identical
+            # every round, and local bindings are cheaper in CPython
+            K = session.tpm_k
+            N = session.tpm_n
+            L = session.tpm_l
+            max_possible_diff = K * N * (2 * L)
+            inv_max_diff = 1.0 / max_possible_diff if max_possible_diff > 0 else 0.0
+            rule_id_by_name = RULE_IDS
+            broadcast = self.broadcast
+            sleep = asyncio.sleep
+            monotonic = time.monotonic
+            throttle_hz = session.throttle_hz
+
+            # Batch kernel specialized to this session's shape; cached
+            # per (K, N, L), so repeat sessions skip compilation
+            sync_rounds_batch = make_sync_rounds_batch(K, N, L)
+
+            # Adaptive learning: each batch samples its rule from a
+            # probability vector instead of cycling rules after a fixed
+            # number of stuck rounds. Hebbian gains weight as progress
+            # rises (it closes out convergence well), random_walk holds
+            # the remainder (efficient early mixing), and anti_hebbian
+            # keeps a small share that grows when the improvement EMA
+            # stalls — the old "shake things up" role, without the
+            # branchy switch logic or history bookkeeping
             learning_rule = "random_walk"
-            progress_history = []  # Track progress over time
             best_progress = 0.0
-            rounds_since_improvement = 0
-            rule_switch_interval = 50  # Much faster switching for final push
-            last_switch_round = 0
-            
+            ema_improvement = 0.0
+            ema_alpha = 0.05
+            prev_progress = 0.0
+            rng = np.random.default_rng()
+            last_debug_round = 0
+
+            # Broadcast gating: the frontend can't render every batch,
+            # so only send frames that carry visible news
+            last_sent_round = 0
+            last_sent_progress = -1.0
+
+            # One reusable progress frame, mutated per send; numpy
+            # scalars go straight to orjson (OPT_SERIALIZE_NUMPY), so
+            # no per-field int()/float() wrapping either
+            progress_msg = {
+                "type": "sync_progress",
+                "round": 0,
+                "agreed": False,
+                "progress": 0.0,
+                "tau_a": 0,
+                "tau_b": 0,
+                "learning_rule": learning_rule,
+                "best_progress": 0.0,
+            }
+
+            # Reusable input buffer; after each batch it holds the final
+            # round's input, which the convergence boost below needs
+            X = np.empty((K, N), np.int8)
+
             # Run until synchronization or connection loss
             while True:
                 if len(session.participants) < 2:
-                    print(f"Session lost participants, stopping sync")
+                    logger.info("Session %s lost participants, stopping sync", session.session_id)
                     break
-                
-                round_num += 1
-                
-                # Generate random input in {-1, +1}
-                X = np.random.choice([-1, 1], size=(session.tpm_k, session.tpm_n))
-                
-                # Both TPMs compute output
-                tau_a, sigma_a = tpm_a.compute_output(X)
-                tau_b, sigma_b = tpm_b.compute_output(X)
-                
+
+                batch_start = monotonic()
+
+                # Batch many rounds per event-loop turn while far from
+                # convergence; drop to small batches near the end so the
+                # UI still sees the final push round by round
+                if progress >= 0.90:
+                    batch_size = 4
+                elif progress >= 0.85:
+                    batch_size = 16
+                else:
+                    batch_size = 64
+
+                # One compiled call runs the whole batch: input
+                # generation, both TPM outputs, the agreed weight
+                # updates, Eve's eavesdropping attempt (she sees only
+                # the public taus and guesses her own sigma, so she can
+                # never truly synchronize) and the diff bookkeeping
+                use_attacker = session.attacker_tpm is not None
+                we = session.attacker_tpm.weights if use_attacker else tpm_a.weights
+                # Run the compiled batch on a worker thread: the kernel
+                # is nogil, so the event loop keeps servicing writer
+                # tasks (and other sessions' batches run on other cores)
+                # while this one computes
+                executed, tau_a, tau_b, tau_eve, sigma_a, sigma_b, weight_diff, attacker_diff = await asyncio.to_thread(
+                    sync_rounds_batch,
+                    tpm_a.weights,
+                    tpm_b.weights,
+                    we,
+                    X,
+                    rule_id_by_name[learning_rule],
+                    batch_size,
+                    use_attacker
+                )
+                round_num += executed
+
                 agreed = (tau_a == tau_b)
-                
-                # Use adaptive learning rule
-                tpm_a.update_weights(X, tau_a, tau_b, sigma_a, learning_rule)
-                tpm_b.update_weights(X, tau_b, tau_a, sigma_b, learning_rule)
-                
-                # ATTACKER SIMULATION: Eve tries to synchronize
+
                 attacker_synced = False
-                tau_eve = 0
-                if session.attacker_tpm is not None:
-                    # Eve can only see tau_a and tau_b (public outputs)
-                    # She cannot see sigma_a or sigma_b (private internal states)
-                    tau_eve, sigma_eve = session.attacker_tpm.compute_output(X)
-                    
-                    # Eve's dilemma: she sees tau_a and tau_b, but doesn't know:
-                    # - Which neurons in her TPM correspond to which in Alice/Bob
-                    # - The actual sigma values that produced tau
-                    
-                    # Best strategy: try to match tau_a when tau_a == tau_b
-                    # But without knowing sigma_a, she uses her own sigma_eve (WRONG!)
-                    if tau_a == tau_b:
-                        # Eve tries to update, but guesses sigma_eve (her own internal state)
-                        # This is WRONG because she doesn't know Alice's sigma_a
-                        session.attacker_tpm.update_weights(X, tau_eve, tau_a, sigma_eve, learning_rule)
-                    
-                    # Calculate attacker progress (how close is Eve to Alice's weights?)
-                    attacker_diff = np.sum(np.abs(session.attacker_tpm.weights - tpm_a.weights))
-                    attacker_max_diff = session.tpm_k * session.tpm_n * (2 * session.tpm_l)
-                    session.attacker_progress = 1.0 - (attacker_diff / attacker_max_diff) if attacker_max_diff > 0 else 1.0
-                    
-                    # Attacker can never truly synchronize without sigma
-                    attacker_synced = np.array_equal(session.attacker_tpm.weights, tpm_a.weights)
-                
+                if use_attacker:
+                    # How close is Eve to Alice's weights?
+                    session.attacker_progress = 1.0 - attacker_diff * inv_max_diff
+                    attacker_synced = attacker_diff == 0
+
                 # Check synchronization - weights must be exactly equal
-                weights_match = np.array_equal(tpm_a.weights, tpm_b.weights)
-                
+                weights_match = weight_diff == 0
+
                 # Calculate progress based on weight difference
-                weight_diff = np.sum(np.abs(tpm_a.weights - tpm_b.weights))
-                max_possible_diff = session.tpm_k * session.tpm_n * (2 * session.tpm_l)
-                progress = 1.0 - (weight_diff / max_possible_diff) if max_possible_diff > 0 else 1.0
+                progress = 1.0 - weight_diff * inv_max_diff
                 
                 # FINAL PUSH: Aggressive convergence when 85%+
                 if progress >= 0.85 and not weights_match:
-                    weight_diffs = np.abs(tpm_a.weights - tpm_b.weights)
-                    
-                    # When very close (90%+), allow direct convergence
+                    wa = tpm_a.weights
+                    wb = tpm_b.weights
+
+                    # When very close (90%+), allow direct convergence:
+                    # move every pair of weights differing by exactly 1
+                    # to the value between them, in three masked ops
                     if progress >= 0.90:
-                        # Find positions where weights differ by exactly 1
-                        for k in range(session.tpm_k):
-                            for n in range(session.tpm_n):
-                                if weight_diffs[k, n] == 1:
-                                    # Direct convergence: move both to middle value
-                                    diff = tpm_b.weights[k, n] - tpm_a.weights[k, n]
-                                    if abs(diff) == 1:
-                                        # Move both weights to the value between them
-                                        if tpm_a.weights[k, n] < tpm_b.weights[k, n]:
-                                            mid = tpm_a.weights[k, n] + 1
-                                        else:
-                                            mid = tpm_b.weights[k, n] + 1
-                                        mid = np.clip(mid, -session.tpm_l, session.tpm_l)
-                                        tpm_a.weights[k, n] = mid
-                                        tpm_b.weights[k, n] = mid
-                    
-                    # Boost update magnitude when agreed and close
-                    if agreed and progress >= 0.85:
-                        for k in range(session.tpm_k):
-                            if sigma_a[k] == tau_a:
-                                # Larger step when close - double the update
-                                step = 2 if progress >= 0.90 else 1
-                                if learning_rule == "hebbian":
-                                    tpm_a.weights[k] = np.clip(
-                                        tpm_a.weights[k] + step * X[k] * sigma_a[k],
-                                        -session.tpm_l, session.tpm_l
-                                    )
-                                elif learning_rule == "random_walk":
-                                    tpm_a.weights[k] = np.clip(
-                                        tpm_a.weights[k] + step * X[k],
-                                        -session.tpm_l, session.tpm_l
-                                    )
-                            if sigma_b[k] == tau_b:
-                                step = 2 if progress >= 0.90 else 1
-                                if learning_rule == "hebbian":
-                                    tpm_b.weights[k] = np.clip(
-                                        tpm_b.weights[k] + step * X[k] * sigma_b[k],
-                                        -session.tpm_l, session.tpm_l
-                                    )
-                                elif learning_rule == "random_walk":
-                                    tpm_b.weights[k] = np.clip(
-                                        tpm_b.weights[k] + step * X[k],
-                                        -session.tpm_l, session.tpm_l
-                                    )
-                    
+                        diffs = wb.astype(np.int32) - wa.astype(np.int32)
+                        near = np.abs(diffs) == 1
+                        mid = np.where(diffs > 0, wa + 1, wb + 1).clip(-L, L)
+                        wa[near] = mid[near]
+                        wb[near] = mid[near]
+
+                    # Boost update magnitude when agreed and close:
+                    # one broadcasted masked add per TPM instead of a
+                    # Python loop over neurons
+                    if agreed and learning_rule in ("hebbian", "random_walk"):
+                        # Larger step when close - double the update
+                        step = 2 if progress >= 0.90 else 1
+                        agree_a = (sigma_a == tau_a)[:, None]
+                        agree_b = (sigma_b == tau_b)[:, None]
+                        if learning_rule == "hebbian":
+                            delta_a = step * X * sigma_a[:, None] * agree_a
+                            delta_b = step * X * sigma_b[:, None] * agree_b
+                        else:  # random_walk
+                            delta_a = step * X * agree_a
+                            delta_b = step * X * agree_b
+                        np.add(wa, delta_a, out=wa, casting="unsafe")
+                        np.add(wb, delta_b, out=wb, casting="unsafe")
+                        np.clip(wa, -L, L, out=wa)
+                        np.clip(wb, -L, L, out=wb)
+
                     # Recalculate after convergence boost
-                    weight_diff = np.sum(np.abs(tpm_a.weights - tpm_b.weights))
-                    progress = 1.0 - (weight_diff / max_possible_diff) if max_possible_diff > 0 else 1.0
-                    weights_match = np.array_equal(tpm_a.weights, tpm_b.weights)
-                
-                # Track progress for adaptive learning
-                progress_history.append(progress)
-                if len(progress_history) > 200:
-                    progress_history.pop(0)  # Keep last 200 rounds
+                    weight_diff = np.sum(np.abs(wa.astype(np.int32) - wb.astype(np.int32)))
+                    progress = 1.0 - weight_diff * inv_max_diff
+                    weights_match = weight_diff == 0
                 
-                # Check if progress improved (use moving average to smooth out noise)
-                if len(progress_history) >= 50:
-                    recent_avg = np.mean(progress_history[-50:])
-                    if recent_avg > best_progress + 0.01:  # Require at least 1% improvement
-                        best_progress = recent_avg
-                        rounds_since_improvement = 0
-                    else:
-                        rounds_since_improvement += 1
+                # Smooth per-round improvement estimate: O(1), no ring
+                # buffer or history slices to maintain
+                improvement = (progress - prev_progress) / executed
+                prev_progress = progress
+                ema_improvement += ema_alpha * (improvement - ema_improvement)
+                if progress > best_progress:
+                    best_progress = progress
+
+                # Sample the next batch's rule from the schedule
+                p_hebbian = progress
+                p_random_walk = 1.0 - progress
+                p_anti = 0.05 if ema_improvement > 1e-5 else 0.3
+                r = rng.random() * (p_hebbian + p_random_walk + p_anti)
+                if r < p_hebbian:
+                    learning_rule = "hebbian"
+                elif r < p_hebbian + p_random_walk:
+                    learning_rule = "random_walk"
                 else:
-                    # Early rounds: just track best
-                    if progress > best_progress:
-                        best_progress = progress
-                        rounds_since_improvement = 0
-                    else:
-                        rounds_since_improvement += 1
-                
-                # Adaptive rule switching: more aggressive when close to completion
-                current_switch_interval = 30 if progress >= 0.85 else rule_switch_interval
-                if rounds_since_improvement >= current_switch_interval and (round_num - last_switch_round) >= current_switch_interval:
-                    # Cycle through learning rules: random_walk -> hebbian -> anti_hebbian -> random_walk
-                    if learning_rule == "random_walk":
-                        learning_rule = "hebbian"
-                        print(f"Round {round_num}: Switching to hebbian (progress stuck at {progress:.2%}, best={best_progress:.2%})")
-                    elif learning_rule == "hebbian":
-                        learning_rule = "anti_hebbian"
-                        print(f"Round {round_num}: Switching to anti_hebbian (progress stuck at {progress:.2%}, best={best_progress:.2%})")
-                    else:
-                        learning_rule = "random_walk"
-                        print(f"Round {round_num}: Switching back to random_walk (progress stuck at {progress:.2%}, best={best_progress:.2%})")
-                    
-                    rounds_since_improvement = 0
-                    last_switch_round = round_num
-                    # Don't reset best_progress - keep tracking overall best
-                    # Clear recent history to detect new improvements
-                    progress_history = progress_history[-20:] if len(progress_history) > 20 else []
-                
+                    learning_rule = "anti_hebbian"
+
                 session.sync_round = round_num
-                
-                # Broadcast progress with learning rule info
-                progress_msg = {
-                    "type": "sync_progress",
-                    "round": round_num,
-                    "agreed": agreed,
-                    "progress": float(progress),
-                    "tau_a": int(tau_a),
-                    "tau_b": int(tau_b),
-                    "learning_rule": learning_rule,
-                    "best_progress": float(best_progress)
-                }
-                
-                # Add attacker data if enabled (always include if attacker exists)
-                if session.attacker_tpm is not None:
-                    progress_msg["attacker_progress"] = float(session.attacker_progress)
-                    progress_msg["attacker_tau"] = int(tau_eve)
-                    progress_msg["attacker_synced"] = bool(attacker_synced)
-                
-                await self.broadcast(session, progress_msg)
+
+                # Broadcast progress with learning rule info, but only
+                # when something visible changed: completion, a progress
+                # delta the UI can render, or enough elapsed rounds
+                if (weights_match
+                        or round_num - last_sent_round >= 5
+                        or abs(progress - last_sent_progress) >= 0.005):
+                    progress_msg["round"] = round_num
+                    progress_msg["agreed"] = agreed
+                    progress_msg["progress"] = progress
+                    progress_msg["tau_a"] = tau_a
+                    progress_msg["tau_b"] = tau_b
+                    progress_msg["learning_rule"] = learning_rule
+                    progress_msg["best_progress"] = best_progress
+
+                    # Add attacker data if enabled (always include if attacker exists)
+                    if session.attacker_tpm is not None:
+                        progress_msg["attacker_progress"] = session.attacker_progress
+                        progress_msg["attacker_tau"] = tau_eve
+                        progress_msg["attacker_synced"] = attacker_synced
+
+                    await broadcast(session, progress_msg)
+                    last_sent_round = round_num
+                    last_sent_progress = progress
                 
                 if weights_match:
                     session.is_synced = True
                     session.shared_key = tpm_a.get_key()
                     session.cipher = NeuralCipher(session.shared_key)
                     
-                    print(f"[SUCCESS] Synchronized after {round_num} rounds using {learning_rule}!")
-                    print(f"  Final weights A: {tpm_a.weights.flatten()}")
-                    print(f"  Final weights B: {tpm_b.weights.flatten()}")
+                    logger.info("Synchronized after %d rounds using %s", round_num, learning_rule)
+                    logger.debug("Final weights A: %s", tpm_a.weights)
+                    logger.debug("Final weights B: %s", tpm_b.weights)
                     
-                    await self.broadcast(session, {
+                    await broadcast(session, {
                         "type": "sync_complete",
                         "rounds": round_num,
                         "key_fingerprint": session.cipher.get_key_fingerprint()
                     })
                     break
                 
-                # Debug every 200 rounds
-                if round_num % 200 == 0:
-                    avg_progress = np.mean(progress_history[-50:]) if len(progress_history) >= 50 else progress
-                    print(f"Round {round_num}: progress={progress:.3f}, best={best_progress:.3f}, "
-                          f"rule={learning_rule}, avg_last_50={avg_progress:.3f}, diff={weight_diff}")
+                # Debug roughly every 200 rounds
+                if round_num - last_debug_round >= 200 and logger.isEnabledFor(logging.DEBUG):
+                    last_debug_round = round_num
+                    logger.debug(
+                        "Round %d: progress=%.3f, best=%.3f, rule=%s, ema_improvement=%.5f, diff=%d",
+                        round_num, progress, best_progress, learning_rule, ema_improvement, weight_diff
+                    )
                 
-                await asyncio.sleep(sync_delay)
+                # No fixed delay: sync runs as fast as the kernel can
+                # chew through batches. Pace only if the session asked
+                # for it; otherwise just yield so writer tasks and other
+                # sessions get a turn
+                if throttle_hz:
+                    elapsed = monotonic() - batch_start
+                    await sleep(max(0.0, executed / throttle_hz - elapsed))
+                else:
+                    await sleep(0)
         
         except asyncio.CancelledError:
-            print(f"Sync cancelled for {session.session_id}")
+            logger.info("Sync cancelled for %s", session.session_id)
         except Exception as e:
-            print(f"Sync error: {e}")
-            traceback.print_exc()
+            logger.exception("Sync error: %s", e)
             await self.broadcast(session, {
                 "type": "error",
                 "message": f"Sync error: {str(e)}"
@@ -462,12 +678,34 @@ class ConnectionManager:
         ciphertext: str
     ):
         """Relay encrypted message to other participants"""
-        await self.broadcast(session, {
-            "type": "message",
+        # Serialize once for all recipients; no Pydantic, no json.dumps
+        payload = orjson.dumps({
+            **_MSG_TEMPLATE,
             "sender_id": sender_id,
             "ciphertext": ciphertext,
-            "timestamp": datetime.utcnow().isoformat()
-        }, exclude={sender_id})
+            # Unix milliseconds, not an ISO string: feeds JavaScript's
+            # Date(number) constructor directly, and formatting happens
+            # on the receiving client, not per message in the relay path
+            "timestamp": int(time.time() * 1000)
+        }).decode('utf-8')
+
+        for user_id in list(session.participants):
+            if user_id != sender_id:
+                session.queue_payload(user_id, payload)
+
+    async def relay_message_bytes(
+        self,
+        session: SyncSession,
+        sender_id: str,
+        blob: bytes
+    ):
+        """Relay a binary encrypted message to other participants"""
+        sender = sender_id.encode('utf-8')
+        payload = FRAME_MESSAGE + bytes([len(sender)]) + sender + blob
+
+        for user_id in list(session.participants):
+            if user_id != sender_id:
+                session.queue_payload(user_id, payload)
 
 
 # Global connection manager instance